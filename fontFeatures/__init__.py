@@ -3,6 +3,7 @@ from collections import OrderedDict
 from fontTools.feaLib.ast import ValueRecord
 from itertools import chain
 from bidict import bidict
+import sys
 
 
 class FontFeatures:
@@ -31,6 +32,7 @@ class FontFeatures:
         self.symbols = {}
         self.scratch = {}  # Space for items to communicate context to each other. :(
         self.doneUsageMarking = False
+        self._glyph_intern = {}
 
     def gensym(self, category):
         if not category in self.symbols:
@@ -38,6 +40,14 @@ class FontFeatures:
         self.symbols[category] += 1
         return f'{category}{self.symbols[category]}'
 
+    def internGlyph(self, name):
+        """Returns the one shared string object for a glyph name, so that
+      every rule holding that glyph refers to the same object."""
+        interned = self._glyph_intern.get(name)
+        if interned is None:
+            interned = self._glyph_intern[name] = sys.intern(name)
+        return interned
+
     def addRoutine(self, r):
         assert isinstance(r, Routine)
         self.routines.append(r)
@@ -91,7 +101,7 @@ class FontFeatures:
                     routine.usedin.add(chain)
         self.doneUsageMarking = True
 
-    from .feaLib.FontFeatures import asFea, asFeaAST
+    from .feaLib.FontFeatures import asFea, asFeaAST, writeFea
 
     def hoist_languages(self):
         # Sort into scripts and languages, resolve wildcards
@@ -130,6 +140,21 @@ class FontFeatures:
 
 
 class Routine:
+    __slots__ = (
+        "name",
+        "usedin",
+        "rules",
+        "address",
+        "comments",
+        "inlined",
+        "languages",
+        "parent",
+        "flags",
+        # Only set when a routine filters marks; checked with hasattr()
+        "markFilteringSet",
+        "markFilteringSetAsClass",
+    )
+
     def __init__(
         self,
         name="",
@@ -168,7 +193,12 @@ class Routine:
 
 
 class Rule:
-    def asFea(self):
+    __slots__ = ()
+
+    def asFea(self, out=None):
+        if out is not None:
+            out.append(self.asFeaAST().asFea())
+            return
         return self.asFeaAST().asFea()
 
     def feaPreamble(self, ff):
@@ -181,6 +211,18 @@ class Substitution(Rule):
   substitutions. Optionally, substitutions may be followed by precontext and
   postcontext."""
 
+    __slots__ = (
+        "precontext",
+        "postcontext",
+        "input",
+        "replacement",
+        "address",
+        "lookups",
+        "languages",
+        "flags",
+        "reverse",
+    )
+
     def __init__(
         self,
         input_,
@@ -215,6 +257,17 @@ class Substitution(Rule):
 
 
 class Chaining(Rule):
+    __slots__ = (
+        "precontext",
+        "postcontext",
+        "input",
+        "address",
+        "lookups",
+        "languages",
+        "flags",
+        "_suborpos_cache",
+    )
+
     # For now
     def __init__(
         self,
@@ -245,6 +298,16 @@ class Chaining(Rule):
 
 
 class Positioning(Rule):
+    __slots__ = (
+        "precontext",
+        "postcontext",
+        "glyphs",
+        "valuerecords",
+        "address",
+        "languages",
+        "flags",
+    )
+
     def __init__(
         self,
         glyphs,
@@ -275,6 +338,19 @@ class Positioning(Rule):
 
 
 class Attachment(Rule):
+    __slots__ = (
+        "base_name",
+        "mark_name",
+        "bases",
+        "marks",
+        "flags",
+        "address",
+        "font",
+        # Filled in by feaPreamble
+        "markslist",
+        "baseslist",
+    )
+
     def __init__(
         self, base_name, mark_name, bases=None, marks=None, flags=0, address=None,
         font=None
@@ -1,6 +1,5 @@
 # Code for converting a Attachment object into feaLib statements
 import fontTools.feaLib.ast as feaast
-from glyphtools import categorize_glyph
 import warnings
 
 
@@ -61,15 +60,20 @@ def asFeaAST(self):
     else:
         if not hasattr(self, "baseslist"):
             sortByAnchor(self)  # e.g. when testing
+        # Look the glyph classes up once, not once per base; with a lazily
+        # loaded font this also leaves the rest of GDEF undecompiled
+        classDefs = None
+        if self.font and "GDEF" in self.font:
+            classDefs = self.font["GDEF"].table.GlyphClassDef.classDefs
         for base in self.baseslist:
             statementtype = feaast.MarkBasePosStatement
             if self.font:
-                if "GDEF" not in self.font:
+                if classDefs is None:
                     warnings.warn("# No GDEF table; can't distinguish marks and bases. mkmk won't work.")
-                elif base[0][0] not in self.font["GDEF"].table.GlyphClassDef.classDefs:
+                elif base[0][0] not in classDefs:
                     warnings.warn("# Glyph %s not found in attachment; skipping" % base[0][0])
                     continue
-                elif categorize_glyph(self.font,base[0][0])[0] == "mark":
+                elif classDefs[base[0][0]] == 3:  # Mark glyph
                     statementtype = feaast.MarkMarkPosStatement
             b.statements.append(
                 statementtype(
@@ -1,6 +1,8 @@
 # Code for converting a Chaining object into feaLib statements
 import fontTools.feaLib.ast as feaast
 import fontFeatures
+from collections import deque
+import sys
 
 
 # Can we chain multiple lookups?
@@ -24,21 +26,37 @@ def glyphref(g):
 
 
 def suborpos(lookups):
-    for l in lookups:
+    # Walk the lookup tree breadth-first; the first concrete rule found
+    # tells us whether this is a substitution or positioning chain.
+    Substitution = fontFeatures.Substitution
+    Positioning = fontFeatures.Positioning
+    Attachment = fontFeatures.Attachment
+    Chaining = fontFeatures.Chaining
+    queue = deque(lookups)
+    seen = set()
+    while queue:
+        l = queue.popleft()
         if not l:
             continue
         for aLookup in l:
-            if not aLookup:
+            if not aLookup or id(aLookup) in seen:
                 continue
+            seen.add(id(aLookup))
             for r in aLookup.rules:
-                if isinstance(r, fontFeatures.Substitution):
+                t = type(r)
+                if t is Substitution:
                     return "sub"
-                if isinstance(r, fontFeatures.Positioning):
+                if t is Positioning or t is Attachment:
                     return "pos"
-                if isinstance(r, fontFeatures.Attachment):
-                    return "pos"
-                if isinstance(r, fontFeatures.Chaining):
-                    return suborpos(r.lookups)
+                if t is Chaining:
+                    queue.extend(r.lookups)
+
+
+def _suborpos(self):
+    # Cached on the rule; reset whenever the routines in self.lookups change
+    if getattr(self, "_suborpos_cache", None) is None:
+        self._suborpos_cache = suborpos(self.lookups)
+    return self._suborpos_cache
 
 
 def gensym(ff):
@@ -49,15 +67,37 @@ def gensym(ff):
 
 
 def replaceLongWithClasses(i, ff):
+    glyphclasses = ff.scratch["glyphclasses"]
     for ix, gc in enumerate(i):
         if len(gc) > 5:
-            classname = ff.getNamedClassFor(sorted(gc), "class" + gensym(ff))
+            key = frozenset(gc)
+            if key in glyphclasses:
+                classname = glyphclasses[key]
+            else:
+                classname = ff.getNamedClassFor(
+                    sorted(gc), sys.intern("class" + gensym(ff))
+                )
+                # A set key would conflate classes which repeat a glyph
+                if len(key) == len(gc):
+                    glyphclasses[key] = classname
             i[ix] = ["@" + classname]
 
 
+def _compatibleRoutines(merger, a, b):
+    # Routines whose rules are of different kinds can never share a lookup,
+    # so don't bother arranging a trial merge of them
+    if a.rules and b.rules and type(a.rules[0]) is not type(b.rules[0]):
+        return False
+    return bool(merger.compatibleRules(a, b))
+
+
 def feaPreamble(self, ff):
     if not "glyphclasses" in ff.scratch:
-        ff.scratch["glyphclasses"] = {tuple(sorted(ff.namedClasses[g])): g for g in ff.namedClasses.keys()}
+        ff.scratch["glyphclasses"] = {
+            frozenset(v): k
+            for k, v in ff.namedClasses.items()
+            if len(set(v)) == len(v)
+        }
     replaceLongWithClasses(self.input, ff)
     replaceLongWithClasses(self.precontext, ff)
     replaceLongWithClasses(self.postcontext, ff)
@@ -70,30 +110,45 @@ def feaPreamble(self, ff):
         ff.markRoutineUseInChains()
         if not "synthesised_lookups" in ff.scratch:
             ff.scratch["synthesised_lookups"] = {}
+        if not "compat_cache" in ff.scratch:
+            ff.scratch["compat_cache"] = {}
+        merger = MergeNonOverlappingRoutines()
+        synthesised_lookups = ff.scratch["synthesised_lookups"]
+        compat_cache = ff.scratch["compat_cache"]
         for ix, lookuplist in enumerate(self.lookups):
             if not lookuplist:
                 continue
 
             if len(lookuplist) == 2:  # Test purposes
-                synthname = lookuplist[0].name + "_" + lookuplist[1].name
-                synthname2 = lookuplist[1].name + "_" + lookuplist[0].name
-                if synthname in ff.scratch["synthesised_lookups"]:
-                    self.lookups[ix] = [ff.scratch["synthesised_lookups"][synthname]]
-                elif synthname2 in ff.scratch["synthesised_lookups"]:
-                    self.lookups[ix] = [ff.scratch["synthesised_lookups"][synthname2]]
-                else:
-                    o = MergeNonOverlappingRoutines()
-                    if o.compatibleRules(lookuplist[0], lookuplist[1]):
-                        synthesised = fontFeatures.Routine()
-                        synthesised.rules.extend(lookuplist[0].rules)
-                        synthesised.rules.extend(lookuplist[1].rules)
-                        synthesised.name = synthname
-                        from fontFeatures.optimizer import Optimizer
-
-                        Optimizer().optimize_routine(synthesised)
-                        self.lookups[ix] = [synthesised]
-                        ff.scratch["synthesised_lookups"][synthname] = synthesised
-                        rv.append(synthesised.asFeaAST())
+                # Either order of the same pair synthesises the same lookup.
+                # Routines are keyed by identity, as unnamed ones all share
+                # the name "", and the caches keep them alive.
+                key = frozenset((lookuplist[0], lookuplist[1]))
+                if key in synthesised_lookups:
+                    self.lookups[ix] = [synthesised_lookups[key]]
+                    continue
+                if key not in compat_cache:
+                    compat_cache[key] = _compatibleRoutines(
+                        merger, lookuplist[0], lookuplist[1]
+                    )
+                if compat_cache[key]:
+                    synthesised = fontFeatures.Routine()
+                    synthesised.rules.extend(lookuplist[0].rules)
+                    synthesised.rules.extend(lookuplist[1].rules)
+                    if lookuplist[0].name and lookuplist[1].name:
+                        synthesised.name = (
+                            lookuplist[0].name + "_" + lookuplist[1].name
+                        )
+                    else:
+                        # Pairs of unnamed routines need names of their own
+                        synthesised.name = ff.gensym("Routine_")
+                    from fontFeatures.optimizer import Optimizer
+
+                    Optimizer(ff).optimize_routine(synthesised, level=1)
+                    self.lookups[ix] = [synthesised]
+                    synthesised_lookups[key] = synthesised
+                    rv.append(synthesised.asFeaAST())
+        self._suborpos_cache = None
     return rv
 
 
@@ -101,7 +156,7 @@ def _complex(self):
     import warnings
 
     if EXPERIMENTAL_FONTTOOLS:
-        if suborpos(self.lookups) == "sub":
+        if _suborpos(self) == "sub":
             routine = feaast.ChainContextSubstStatement
         else:
             routine = feaast.ChainContextPosStatement
@@ -118,15 +173,24 @@ def _complex(self):
 
 
 def asFeaAST(self):
-    if len(self.lookups) > 0 and any([x is not None for x in self.lookups]):
+    # One pass to see whether there are any lookups, and whether any
+    # position calls more than one
+    has_lookups = False
+    is_complex = False
+    for x in self.lookups:
+        if x is not None:
+            has_lookups = True
+            if len(x) > 1:
+                is_complex = True
+                break
+    if has_lookups:
+        if is_complex:
+            return _complex(self)
         # Fill in the blanks
-        if suborpos(self.lookups) == "sub":
+        if _suborpos(self) == "sub":
             routine = feaast.ChainContextSubstStatement
         else:
             routine = feaast.ChainContextPosStatement
-        # Check for >1 lookups per position
-        if any([x and len(x) > 1 for x in self.lookups]):
-            return _complex(self)
         if EXPERIMENTAL_FONTTOOLS:
             lookups = self.lookups
         else:
@@ -150,5 +214,8 @@ def asFeaAST(self):
         )
 
 
-def asFea(self):
+def asFea(self, out=None):
+    if out is not None:
+        out.append(self.asFeaAST().asFea())
+        return
     return self.asFeaAST().asFea()
@@ -4,17 +4,39 @@ import fontTools.feaLib.ast as feaast
 
 def add_language_system_statements(self, ff):
     self.hoist_languages()
-    if len(self.scripts_and_languages.keys()) == 0:
+    if len(self.scripts_and_languages) == 0:
         return
-    if len(self.scripts_and_languages.keys()) == 1:
+    if len(self.scripts_and_languages) == 1:
         return
     for s, entry in self.scripts_and_languages.items():
         for l in entry:
             ff.statements.append(feaast.LanguageSystemStatement(s, l))
 
 
-def asFea(self):
-    return self.asFeaAST().asFea()
+def _emitFea(self, write):
+    for ix, statement in enumerate(self.asFeaAST().statements):
+        if ix:
+            write("\n")
+        write(statement.asFea())
+
+
+def asFea(self, out=None):
+    """Returns this font's features as AFDKO feature code. If a list ``out``
+  is given, the code is appended to it piece by piece instead, so that
+  callers assembling larger output can join everything once at the end."""
+    if out is not None:
+        _emitFea(self, out.append)
+        return
+    buf = []
+    _emitFea(self, buf.append)
+    return "".join(buf)
+
+
+def writeFea(self, fp):
+    """Writes this font's features as AFDKO feature code to the file-like
+  object ``fp``. Each top-level statement is written as soon as it has been
+  serialized, rather than assembling the whole feature file in memory."""
+    _emitFea(self, fp.write)
 
 
 def asFeaAST(self):
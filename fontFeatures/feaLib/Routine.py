@@ -1,21 +1,44 @@
 # Code for converting a Routine object into feaLib statements
 import fontTools.feaLib.ast as feaast
+from collections import defaultdict
 from fontFeatures.ttLib.Substitution import lookup_type as sub_lookup_type
 from fontFeatures.ttLib.Positioning import lookup_type as pos_lookup_type
 
 
-def lookup_type(rule):
-    from fontFeatures import Substitution, Positioning, Attachment, Chaining
+_CLASSES = {}
+
+
+def _cls(name):
+    # fontFeatures imports this module while it is being defined, so its
+    # classes are bound on first use rather than at import time
+    c = _CLASSES.get(name)
+    if c is None:
+        import fontFeatures
+
+        c = _CLASSES[name] = getattr(fontFeatures, name)
+    return c
+
 
-    if isinstance(rule, Substitution):
-        return sub_lookup_type(rule)
-    if isinstance(rule, Positioning):
-        return pos_lookup_type(rule)
-    if isinstance(rule, Attachment):
-        return rule.is_cursive
-    if isinstance(rule, Chaining):
-        return 1
-    raise ValueError
+_LOOKUP_TYPES = {}
+
+
+def lookup_type(rule):
+    if not _LOOKUP_TYPES:
+        _LOOKUP_TYPES[_cls("Substitution")] = sub_lookup_type
+        _LOOKUP_TYPES[_cls("Positioning")] = pos_lookup_type
+        _LOOKUP_TYPES[_cls("Attachment")] = lambda r: r.is_cursive
+        _LOOKUP_TYPES[_cls("Chaining")] = lambda r: 1
+
+    handler = _LOOKUP_TYPES.get(type(rule))
+    if handler is None:
+        # Subclasses of the rule types are rare; look them up the slow way
+        for klass in type(rule).__mro__:
+            if klass in _LOOKUP_TYPES:
+                handler = _LOOKUP_TYPES[klass]
+                break
+        else:
+            raise ValueError
+    return handler(rule)
 
 
 counter = 0
@@ -27,16 +50,27 @@ def gensym(prefix):
     return prefix + str(counter)
 
 
-def arrange_by_type(self):
-    from fontFeatures import Routine
+def _classify(self):
+    # Group the rules by type, lookup type and flags in a single pass
+    by_type = defaultdict(list)
+    by_lookup_type = defaultdict(list)
+    by_flags = defaultdict(list)
+    for r in self.rules:
+        by_type[type(r)].append(r)
+        by_lookup_type[lookup_type(r)].append(r)
+        by_flags[r.flags].append(r)
+    return by_type, by_lookup_type, by_flags
+
+
+def arrange_by_type(self, ruleTypes=None):
+    Routine = _cls("Routine")
 
     # Arrange into rules of similar type (Substitution/Positioning)
-    ruleTypes = {}
-    for r in self.rules:
-        if not type(r) in ruleTypes:
-            ruleTypes[type(r)] = []
-        ruleTypes[type(r)].append(r)
-    if len(ruleTypes.keys()) == 1:
+    if ruleTypes is None:
+        ruleTypes = defaultdict(list)
+        for r in self.rules:
+            ruleTypes[type(r)].append(r)
+    if len(ruleTypes) == 1:
         return
     routines = []
     for k, v in ruleTypes.items():
@@ -47,19 +81,18 @@ def arrange_by_type(self):
 
 
 # A lookup in OpenType can only contain rules of the same lookup type
-def arrange_by_lookup_type(self):
-    from fontFeatures import Routine
-
-    ruleTypes = {}
-    for r in self.rules:
-        if not lookup_type(r) in ruleTypes:
-            ruleTypes[lookup_type(r)] = []
-        ruleTypes[lookup_type(r)].append(r)
-    if len(ruleTypes.keys()) == 1:
+def arrange_by_lookup_type(self, ruleTypes=None):
+    Routine = _cls("Routine")
+
+    if ruleTypes is None:
+        ruleTypes = defaultdict(list)
+        for r in self.rules:
+            ruleTypes[lookup_type(r)].append(r)
+    if len(ruleTypes) == 1:
         return
     # Special case the fact that a single sub can be expressed as part of a
     # multiple sub if needed
-    if tuple(sorted(ruleTypes.keys())) == (1, 2) or tuple(sorted(ruleTypes.keys())) == (1, 8):
+    if tuple(sorted(ruleTypes)) in ((1, 2), (1, 8)):
         return
     routines = []
     for k, v in ruleTypes.items():
@@ -71,18 +104,17 @@ def arrange_by_lookup_type(self):
 
 
 # A lookup in OpenType can only have one flag
-def arrange_by_flags(self):
-    from fontFeatures import Routine
-
-    flagTypes = {}
-    for r in self.rules:
-        if not r.flags in flagTypes:
-            flagTypes[r.flags] = []
-        flagTypes[r.flags].append(r)
-    if len(flagTypes.keys()) == 1:
+def arrange_by_flags(self, flagTypes=None):
+    Routine = _cls("Routine")
+
+    if flagTypes is None:
+        flagTypes = defaultdict(list)
+        for r in self.rules:
+            flagTypes[r.flags].append(r)
+    if len(flagTypes) == 1:
         if not self.flags:
             self.flags = 0
-        self.flags = self.flags | list(flagTypes.keys())[0]
+        self.flags = self.flags | next(iter(flagTypes))
         return
     routines = []
     for k, v in flagTypes.items():
@@ -94,25 +126,18 @@ def arrange_by_flags(self):
 
 
 def arrange_by_language(self):
-    from fontFeatures import Routine
+    Routine = _cls("Routine")
 
     if not self.languages:
         return
-    languages = {}
-
-    def add_lang(p, r):
-        nonlocal languages
-        if not p in languages:
-            languages[p] = []
-        languages[p].extend(r)
-
+    languages = defaultdict(list)
     for s, l in self.languages:
         if l == "*":
-            add_lang((s, "dflt"), self.rules)
+            languages[(s, "dflt")].extend(self.rules)
         else:
-            add_lang((s, l), self.rules)
+            languages[(s, l)].extend(self.rules)
 
-    if len(languages.keys()) < 2:
+    if len(languages) < 2:
         return
     routines = []
     for k, v in languages.items():
@@ -124,16 +149,17 @@ def arrange_by_language(self):
 
 
 def arrange(self):
-    splitType = arrange_by_type(self)
+    by_type, by_lookup_type, by_flags = _classify(self)
+    splitType = arrange_by_type(self, by_type)
     if splitType:
         return splitType
-    splitType = arrange_by_lookup_type(self)
+    splitType = arrange_by_lookup_type(self, by_lookup_type)
     if splitType:
         return splitType
     splitLang = arrange_by_language(self)
     if splitLang:
         return splitLang
-    splitFlags = arrange_by_flags(self)
+    splitFlags = arrange_by_flags(self, by_flags)
     if splitFlags:
         return splitFlags
     return None
@@ -199,5 +225,8 @@ def asFeaAST(self):
     return f
 
 
-def asFea(self):
+def asFea(self, out=None):
+    if out is not None:
+        out.append(self.asFeaAST().asFea())
+        return
     return self.asFeaAST().asFea()
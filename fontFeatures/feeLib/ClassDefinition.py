@@ -85,6 +85,8 @@ will take any glyph selector and display its contents on standard error.
 
 import re
 from glyphtools import get_glyph_metrics
+import numpy as np
+import sys
 import warnings
 
 
@@ -106,53 +108,110 @@ ShowClass_Args = glyphselector:g -> (g,)
 
 VERBS = ["DefineClass", "ShowClass", "DefineClassBinned"]
 
+COMPARATORS = {
+    ">": np.greater,
+    "<": np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "=": np.equal,
+}
+
+
 class DefineClass:
     @classmethod
     def action(self, parser, classname, definition):
         glyphs = self.resolve_definition(parser, definition[0])
-        predicates = definition[1]
-        for p in predicates:
-            glyphs = list(filter(lambda x: self.meets_predicate(x, p, parser), glyphs))
-        parser.fontfeatures.namedClasses[classname["classname"]] = tuple(glyphs)
+        glyphs = self.filter_by_predicates(parser, glyphs, definition[1])
+        parser.fontfeatures.namedClasses[classname["classname"]] = tuple(
+            sys.intern(g) for g in glyphs
+        )
 
     @classmethod
     def resolve_definition(self, parser, primary):
-        if isinstance(primary, dict) and "conjunction" in primary:
-            left = set(self.resolve_definition(parser, primary["left"]))
-            right = set(self.resolve_definition(parser, primary["right"]))
-            if primary["conjunction"] == "or":
-                return list(left | right)
+        # Selectors repeated within one definition are only resolved once
+        resolved = {}
+
+        def resolve_selector(selector):
+            key = selector.as_text()
+            if key not in resolved:
+                resolved[key] = selector.resolve(parser.fontfeatures, parser.font)
+            return resolved[key]
+
+        if not self._is_conjunction(primary):
+            return resolve_selector(primary)
+
+        # Evaluate the conjunction tree bottom-up without recursing
+        stack = [(primary, False)]
+        results = []
+        while stack:
+            node, children_done = stack.pop()
+            if not self._is_conjunction(node):
+                results.append(set(resolve_selector(node)))
+            elif children_done:
+                right = results.pop()
+                left = results.pop()
+                if node["conjunction"] == "or":
+                    results.append(left | right)
+                else:
+                    results.append(left & right)
             else:
-                return list(left & right)
-        else:
-            return primary.resolve(parser.fontfeatures, parser.font)
+                stack.append((node, True))
+                stack.append((node["right"], False))
+                stack.append((node["left"], False))
+        return list(results[0])
 
     @classmethod
-    def meets_predicate(self, glyphname, predicate, parser):
-        metric = predicate["predicate"]
-        comp = predicate["comparator"]
-        if isinstance(predicate["value"], dict):
-            v = predicate["value"]
-            testvalue_metrics = get_glyph_metrics(parser.font, v["glyph"])
-            if v["metric"] not in testvalue_metrics:
-                raise ValueError("Unknown metric '%s'" % metric)
-            testvalue = testvalue_metrics[v["metric"]]
-        else:
-            testvalue = int(predicate["value"])
-
-        metrics = get_glyph_metrics(parser.font, glyphname)
+    def _is_conjunction(self, primary):
+        return isinstance(primary, dict) and "conjunction" in primary
+
+    @classmethod
+    def get_metric(self, parser, glyphname, metric):
+        # Metrics are extracted once per glyph and reused across predicates
+        if not "glyph_metrics" in parser.fontfeatures.scratch:
+            parser.fontfeatures.scratch["glyph_metrics"] = {}
+        cache = parser.fontfeatures.scratch["glyph_metrics"]
+        if not glyphname in cache:
+            cache[glyphname] = get_glyph_metrics(parser.font, glyphname)
+        metrics = cache[glyphname]
         if metric not in metrics:
             raise ValueError("Unknown metric '%s'" % metric)
-        value = metrics[metric]
-        if comp == ">":
-            return value > testvalue
-        elif comp == "<":
-            return value < testvalue
-        elif comp == ">=":
-            return value >= testvalue
-        elif comp == "<=":
-            return value <= testvalue
-        raise ValueError("Bad comparator (can't happen?)")
+        return metrics[metric]
+
+    @classmethod
+    def test_value(self, parser, predicate):
+        if isinstance(predicate["value"], dict):
+            v = predicate["value"]
+            return self.get_metric(parser, v["glyph"], v["metric"])
+        return int(predicate["value"])
+
+    @classmethod
+    def comparator(self, predicate):
+        if predicate["comparator"] not in COMPARATORS:
+            raise ValueError("Bad comparator (can't happen?)")
+        return COMPARATORS[predicate["comparator"]]
+
+    @classmethod
+    def filter_by_predicates(self, parser, glyphs, predicates):
+        if not predicates:
+            return glyphs
+        glyphs = np.asarray(glyphs, dtype=object)
+        for p in predicates:
+            metric = p["predicate"]
+            comp = self.comparator(p)
+            testvalue = self.test_value(parser, p)
+            values = np.fromiter(
+                (self.get_metric(parser, g, metric) for g in glyphs),
+                dtype=np.float64,
+                count=len(glyphs),
+            )
+            glyphs = glyphs[comp(values, testvalue)]
+        return glyphs.tolist()
+
+    @classmethod
+    def meets_predicate(self, glyphname, predicate, parser):
+        comp = self.comparator(predicate)
+        value = self.get_metric(parser, glyphname, predicate["predicate"])
+        return bool(comp(value, self.test_value(parser, predicate)))
 
 
 class DefineClassBinned(DefineClass):
@@ -160,13 +219,13 @@ class DefineClassBinned(DefineClass):
     def action(self, parser, metric, bincount, classname, definition):
         from glyphtools import bin_glyphs_by_metric
         glyphs = self.resolve_definition(parser, definition[0])
-        predicates = definition[1]
-        for p in predicates:
-            glyphs = list(filter(lambda x: self.meets_predicate(x, p, parser), glyphs))
+        glyphs = self.filter_by_predicates(parser, glyphs, definition[1])
 
         binned = bin_glyphs_by_metric(parser.font, glyphs, metric, bincount=int(bincount))
         for i in range(1, int(bincount) + 1):
-            parser.fontfeatures.namedClasses["%s_%s%i" % (classname["classname"], metric, i)] = tuple(binned[i - 1][0])
+            parser.fontfeatures.namedClasses["%s_%s%i" % (classname["classname"], metric, i)] = tuple(
+                sys.intern(g) for g in binned[i - 1][0]
+            )
 
 
 class ShowClass:
@@ -1,162 +1,312 @@
 from glyphtools import get_glyph_metrics, categorize_glyph
 from fontFeatures import ValueRecord, Attachment, Positioning, Chaining, Routine
+import numpy as np
+import sys
 import warnings
 
+try:
+    import numba
+except ImportError:  # Optional: without it the pure Python loops are used
+    numba = None
 
-def add_value_records(vr1, vr2):
-    if vr1.xPlacement or vr2.xPlacement:
-        vr1.xPlacement = (vr1.xPlacement or 0) + (vr2.xPlacement or 0)
-    if vr1.yPlacement or vr2.yPlacement:
-        vr1.yPlacement = (vr1.yPlacement or 0) + (vr2.yPlacement or 0)
-    if vr1.xAdvance or vr2.xAdvance:
-        vr1.xAdvance = (vr1.xAdvance or 0) + (vr2.xAdvance or 0)
-    if vr1.yAdvance or vr2.yAdvance:
-        vr1.yAdvance = (vr1.yAdvance or 0) + (vr2.yAdvance or 0)
+
+def _anchor_arrays(glyphs, anchors):
+    # Lay a glyph->anchor dictionary out along the buffer
+    found = [anchors.get(g) for g in glyphs]
+    present = np.array([a is not None for a in found], dtype=np.bool_)
+    xs = np.array([a[0] if a else 0 for a in found], dtype=np.int32)
+    ys = np.array([a[1] if a else 0 for a in found], dtype=np.int32)
+    return present, xs, ys
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _attach_kernel(
+        is_base, has_mark, mark_x, mark_y, has_base, base_x, base_y, xPl, yPl, xAdv, ltr
+    ):
+        for ix in range(1, len(is_base)):
+            previous = ix - 1
+            while previous > 0 and not is_base[previous]:
+                previous = previous - 1
+            if has_mark[ix] and has_base[previous]:
+                xPl[ix] += base_x[previous] - mark_x[ix]
+                yPl[ix] += base_y[previous] - mark_y[ix]
+                if ltr:
+                    xPl[ix] -= xAdv[previous]
+
+    @numba.njit(cache=True)
+    def _attach_cursive_kernel(
+        is_base, has_entry, entry_x, entry_y, has_exit, exit_x, exit_y, xPl, yPl, xAdv, rtl
+    ):
+        for j in range(1, len(is_base)):
+            if not is_base[j]:
+                continue
+            i = j - 1
+            while i > 0 and not is_base[i]:
+                i = i - 1
+            if not has_entry[j] or not has_exit[i]:
+                continue
+            if not rtl:
+                raise ValueError("Only right-to-left cursive attachment is supported")
+            d = exit_x[i] + xPl[i]
+            xAdv[i] -= d
+            xPl[i] -= d
+            xAdv[j] = entry_x[j] + xPl[j]
+            # The later glyph hangs off the earlier one (see attach_cursive)
+            yPl[j] = yPl[i] - (entry_y[j] - exit_y[i])
+
+
+else:
+    _attach_kernel = None
+    _attach_cursive_kernel = None
+
+
+class PositioningBuffer:
+    """A glyph string being positioned. Rather than a list of per-glyph
+  records, the buffer is held as parallel arrays: glyph names and categories
+  as lists, and the four positioning values as integer arrays, so that rules
+  can adjust many glyphs at once."""
+
+    def __init__(self, glyphs, categories, xAdvance):
+        self.glyphs = list(glyphs)
+        self.categories = list(categories)
+        n = len(self.glyphs)
+        self.xPlacement = np.zeros(n, dtype=np.int32)
+        self.yPlacement = np.zeros(n, dtype=np.int32)
+        self.xAdvance = np.array(xAdvance, dtype=np.int32).reshape(n)
+        self.yAdvance = np.zeros(n, dtype=np.int32)
+        self.is_base = np.array(
+            [c[0] == "base" for c in self.categories], dtype=np.bool_
+        )
+
+    def __len__(self):
+        return len(self.glyphs)
+
+    def reversed(self):
+        rev = PositioningBuffer(
+            self.glyphs[::-1], self.categories[::-1], self.xAdvance[::-1]
+        )
+        rev.xPlacement = self.xPlacement[::-1].copy()
+        rev.yPlacement = self.yPlacement[::-1].copy()
+        rev.yAdvance = self.yAdvance[::-1].copy()
+        return rev
+
+    def to_dicts(self):
+        """Returns the buffer as a list of ``{"glyph", "position", "category"}``
+    dictionaries."""
+        return [
+            {
+                "glyph": g,
+                "position": ValueRecord(
+                    xPlacement=int(xp),
+                    yPlacement=int(yp),
+                    xAdvance=int(xa),
+                    yAdvance=int(ya),
+                ),
+                "category": c,
+            }
+            for g, c, xp, yp, xa, ya in zip(
+                self.glyphs,
+                self.categories,
+                self.xPlacement,
+                self.yPlacement,
+                self.xAdvance,
+                self.yAdvance,
+            )
+        ]
+
+
+# Features applied by process_fontfeatures, in order, for each direction
+_FEATURES_COMMON = (
+    "frac", "numr", "dnom", "rand",
+    "abvm", "blwm", "ccmp", "locl", "mark", "mkmk", "rlig",
+)
+_FEATURES_HORIZONTAL = ("calt", "clig", "curs", "dist", "kern", "liga", "rclt")
+_FEATURES_LTR = ("rvrn", "ltra", "ltrm") + _FEATURES_COMMON + _FEATURES_HORIZONTAL
+_FEATURES_RTL = ("rvrn", "rtla", "rtlm") + _FEATURES_COMMON + _FEATURES_HORIZONTAL
+_FEATURES_VERTICAL = ("rvrn",) + _FEATURES_COMMON + ("vert",)
 
 
 class JankyPos:
     def __init__(self, font, direction="LTR"):
         self.font = font
         self.direction = direction
+        self._rule_dispatch = {
+            Positioning: self._position,
+            Attachment: self._attach,
+            Chaining: self.chain,
+        }
 
     def serialize_buffer(self, buf):
         """Returns the contents of the given buffer in a string format similar to
     that used by hb-shape."""
-        outs = []
-        for info in buf:
-            position = info["position"]
-            outs.append("%s" % info["glyph"])
-            outs[-1] = outs[-1] + "+%i" % position.xAdvance
-            if position.xPlacement != 0 or position.yPlacement != 0:
-                outs[-1] = outs[-1] + "@<%i,%i>" % (
-                    position.xPlacement or 0,
-                    position.yPlacement or 0,
-                )
-        return "|".join(outs)
+        parts = zip(
+            buf.glyphs,
+            buf.xAdvance.tolist(),
+            buf.xPlacement.tolist(),
+            buf.yPlacement.tolist(),
+        )
+        return "|".join(["%s+%i@<%i,%i>" % info for info in parts])
 
     def positioning_buffer(self, glyphstring):
-        return [
-            {
-                "glyph": g,
-                "position": ValueRecord(
-                    xAdvance=get_glyph_metrics(self.font, g)["width"],
-                ),
-                "category": categorize_glyph(self.font, g),
-            }
-            for g in glyphstring
-        ]
+        # Interned names make the rule-matching comparisons pointer checks
+        glyphstring = [sys.intern(g) for g in glyphstring]
+        return PositioningBuffer(
+            glyphstring,
+            [categorize_glyph(self.font, g) for g in glyphstring],
+            [get_glyph_metrics(self.font, g)["width"] for g in glyphstring],
+        )
 
     def process_fontfeatures(self, buf, ff):
-        features = ["rvrn"]
         if self.direction == "LTR":
-            features.extend(["ltra", "ltrm"])
+            features = _FEATURES_LTR
         elif self.direction == "RTL":
-            features.extend(["rtla", "rtlm"])
-        features.extend(["frac", "numr", "dnom", "rand"])
-        features.extend(["abvm", "blwm", "ccmp", "locl", "mark", "mkmk", "rlig"])
-        if self.direction == "LTR" or self.direction == "RTL":
-            features.extend(["calt", "clig", "curs", "dist", "kern", "liga", "rclt"])
+            features = _FEATURES_RTL
         else:
-            features.extend(["vert"])
+            features = _FEATURES_VERTICAL
 
         for f in features:
             if f not in ff.features:
                 continue
+            rules = []
             for r in ff.features[f]:
                 if isinstance(r, Routine):
-                    buf = self.process_rules(buf, r.rules)
+                    rules.extend(r.rules)
                 else:
-                    buf = self.process_rules(buf, [r])
+                    rules.append(r)
+            buf = self.process_rules(buf, rules)
         if self.direction == "RTL":
-            buf = list(reversed(buf))
+            buf = buf.reversed()
         return buf
 
+    def _handler_for(self, klass):
+        # Subclasses of the rule types are handled like their base class;
+        # resolve them through the MRO once and remember the answer (None
+        # for rules which don't affect positioning)
+        dispatch = self._rule_dispatch
+        for base in klass.__mro__:
+            if base in dispatch:
+                handler = dispatch[base]
+                break
+        else:
+            handler = None
+        dispatch[klass] = handler
+        return handler
+
     def process_rules(self, buf, rules):
+        dispatch = self._rule_dispatch
         for r in rules:
-            if isinstance(r, Positioning):
-                if len(r.glyphs) == 1:
-                    buf = self.position_one(buf, r)
-                else:
-                    continue  # XXX
-            elif isinstance(r, Attachment):
-                if r.is_cursive:
-                    buf = self.attach_cursive(buf, r)
-                else:
-                    buf = self.attach(buf, r)
-            elif isinstance(r, Chaining):
-                buf = self.chain(buf, r)
+            klass = type(r)
+            if klass in dispatch:
+                handler = dispatch[klass]
             else:
-                continue
+                handler = self._handler_for(klass)
+            if handler:
+                buf = handler(buf, r)
         return buf
 
+    def _position(self, buf, rule):
+        if len(rule.glyphs) == 1:
+            return self.position_one(buf, rule)
+        return buf  # XXX
+
+    def _attach(self, buf, rule):
+        if rule.is_cursive:
+            return self.attach_cursive(buf, rule)
+        return self.attach(buf, rule)
+
     def chain(self, buf, rule):
         # XXXX
         return buf
 
     def position_one(self, buf, rule):
-        applicable_range = range(
-            0 + len(rule.precontext), len(buf) - len(rule.postcontext)
-        )
         assert len(rule.glyphs) == 1
-        for i in applicable_range:
-            g, vr = buf[i]["glyph"], buf[i]["position"]
-            if rule.precontext or rule.postcontext:
-                pre = [x["glyph"] for x in buf[i - len(rule.precontext) + 1 : i]]
-                post = [x["glyph"] for x in buf[i + 1 : i + len(rule.postcontext) + 1]]
-                if tuple(pre) != tuple(rule.precontext) or tuple(post) != tuple(
-                    rule.postcontext
-                ):
-                    continue
-            if g not in rule.glyphs[0]:
+        pre_len, post_len = len(rule.precontext), len(rule.postcontext)
+        pre_tup, post_tup = tuple(rule.precontext), tuple(rule.postcontext)
+        has_context = pre_len or post_len
+        glyph_set = frozenset(rule.glyphs[0])
+        glyphs = buf.glyphs
+        matches = []
+        for i in range(pre_len, len(buf) - post_len):
+            if glyphs[i] not in glyph_set:
+                continue
+            if has_context and (
+                tuple(glyphs[i - pre_len + 1 : i]) != pre_tup
+                or tuple(glyphs[i + 1 : i + post_len + 1]) != post_tup
+            ):
                 continue
-            add_value_records(vr, rule.valuerecords[0])
+            matches.append(i)
+        if matches:
+            vr = rule.valuerecords[0]
+            buf.xPlacement[matches] += vr.xPlacement or 0
+            buf.yPlacement[matches] += vr.yPlacement or 0
+            buf.xAdvance[matches] += vr.xAdvance or 0
+            buf.yAdvance[matches] += vr.yAdvance or 0
         return buf
 
     def attach(self, buf, rule):
-        for ix, info in enumerate(buf):
-            g = info["glyph"]
-            vr = info["position"]
+        if _attach_kernel is not None:
+            _attach_kernel(
+                buf.is_base,
+                *_anchor_arrays(buf.glyphs, rule.marks),
+                *_anchor_arrays(buf.glyphs, rule.bases),
+                buf.xPlacement,
+                buf.yPlacement,
+                buf.xAdvance,
+                self.direction == "LTR",
+            )
+            return buf
+        glyphs, categories = buf.glyphs, buf.categories
+        for ix, g in enumerate(glyphs):
             if ix == 0:
                 continue
             # XXX search backwards until you find a base
             # XXX Unless we are doing mkmk
             previous = ix - 1
-            while previous > 0 and buf[previous]["category"][0] != "base":
+            while previous > 0 and categories[previous][0] != "base":
                 previous = previous - 1
-            prev = buf[previous]["glyph"]
-            prevVr = buf[previous]["position"]
+            prev = glyphs[previous]
             if g in rule.marks and ix > 0 and prev in rule.bases:
                 xpos = rule.bases[prev][0] - rule.marks[g][0]
                 ypos = rule.bases[prev][1] - rule.marks[g][1]
-                vr.xPlacement = (vr.xPlacement or 0) + xpos
-                vr.yPlacement = (vr.yPlacement or 0) + ypos
+                buf.xPlacement[ix] += xpos
+                buf.yPlacement[ix] += ypos
                 if self.direction == "LTR":
-                    vr.xPlacement = (vr.xPlacement or 0) - prevVr.xAdvance
+                    buf.xPlacement[ix] -= buf.xAdvance[previous]
         return buf
 
     def attach_cursive(self, buf, rule):
-        for j, info in enumerate(buf):
-            g = info["glyph"]
-            vr = info["position"]
-            if j == 0 or buf[j]["category"][0] != "base":
+        if _attach_cursive_kernel is not None:
+            _attach_cursive_kernel(
+                buf.is_base,
+                *_anchor_arrays(buf.glyphs, rule.bases),
+                *_anchor_arrays(buf.glyphs, rule.marks),
+                buf.xPlacement,
+                buf.yPlacement,
+                buf.xAdvance,
+                self.direction == "RTL",
+            )
+            return buf
+        glyphs, categories = buf.glyphs, buf.categories
+        for j, g in enumerate(glyphs):
+            if j == 0 or categories[j][0] != "base":
                 continue
             i = j - 1
-            while i > 0 and buf[i]["category"][0] != "base":
+            while i > 0 and categories[i][0] != "base":
                 i = i - 1
 
             # Get entry anchor for i and exit anchor for i
-            prev = buf[i]["glyph"]
+            prev = glyphs[i]
             if g not in rule.bases or not prev in rule.marks:
                 continue
             exit_x, exit_y = rule.marks[prev]
             entry_x, entry_y = rule.bases[g]
             if self.direction == "RTL":
-                d = exit_x + (buf[i]["position"].xPlacement or 0)
-                buf[i]["position"].xAdvance = (buf[i]["position"].xAdvance or 0) - d
-                buf[i]["position"].xPlacement = (buf[i]["position"].xPlacement or 0) - d
-                buf[j]["position"].xAdvance = entry_x + (
-                    buf[j]["position"].xPlacement or 0
-                )
+                d = exit_x + buf.xPlacement[i]
+                buf.xAdvance[i] -= d
+                buf.xPlacement[i] -= d
+                buf.xAdvance[j] = entry_x + buf.xPlacement[j]
             else:
                 raise ValueError
             child = i
@@ -167,9 +317,7 @@ class JankyPos:
                 parent, child = child, parent
                 x_offset = -x_offset
                 y_offset = -y_offset
-            buf[child]["position"].yPlacement = (
-                buf[parent]["position"].yPlacement or 0
-            ) + y_offset
+            buf.yPlacement[child] = buf.yPlacement[parent] + y_offset
         return buf
 
 
@@ -5,23 +5,29 @@ import logging
 class MergeNonOverlappingRoutines:
     level = 2
 
+    def __init__(self):
+        # Each routine's glyphs and calling contexts, as frozensets, so that
+        # the pairwise comparisons don't rebuild them every time
+        self.glyphs = {}
+        self.contexts = {}
+
     def apply(self, ff):
         logger = logging.getLogger("fontFeatures")
         deadRoutine = Routine(name="dead")
-
-        def haschains(routine):
-            for r in routine.rules:
-                if isinstance(r, Chaining):
-                    return True
+        self.glyphs = {}
+        self.contexts = {}
 
         routinelist = ff.routines
+        # Merging never adds a chain to a routine, so this can be worked out
+        # once up front rather than for every pair
+        haschains = [any(type(x) is Chaining for x in r.rules) for r in routinelist]
         ff.markRoutineUseInChains()
         for lix, l in enumerate(routinelist):
-            if haschains(l) or l == deadRoutine:
+            if haschains[lix] or l == deadRoutine:
                 continue
             for rix in range(lix + 1, len(routinelist)):
                 r = routinelist[rix]
-                if haschains(r) or r == deadRoutine:
+                if haschains[rix] or r == deadRoutine:
                     continue
                 if self.nonOverlapping(ff, l, r):
                     logger.info(
@@ -31,9 +37,18 @@ class MergeNonOverlappingRoutines:
                     routinelist[rix] = deadRoutine
         ff.routines = list(filter(lambda r: r != deadRoutine, routinelist))
 
+    def involved(self, routine):
+        if routine not in self.glyphs:
+            self.glyphs[routine] = frozenset(routine.involved_glyphs)
+        return self.glyphs[routine]
+
     def whatuses(self, routine, ff):
         # Compute the glyphs which are a context for a routine to be called
-        return set.union(set([]), *[c.involved_glyphs for c in list(routine.usedin)])
+        if routine not in self.contexts:
+            self.contexts[routine] = frozenset(
+                set.union(set([]), *[c.involved_glyphs for c in list(routine.usedin)])
+            )
+        return self.contexts[routine]
 
     def replaceAllReferences(self, usedin, first, second):
         for i in usedin:
@@ -45,6 +60,8 @@ class MergeNonOverlappingRoutines:
                         routinelist[ix] = second
 
     def merge(self, l, r):
+        self.glyphs[l] = self.involved(l) | self.involved(r)
+        self.contexts[l] = self.whatuses(l, None) | self.whatuses(r, None)
         l.rules.extend(r.rules)
         if l.name and r.name:
             l.name = l.name + "_" + r.name
@@ -56,13 +73,14 @@ class MergeNonOverlappingRoutines:
 
     def nonOverlapping(self, ff, l, r):
         return (
-            not (l.involved_glyphs & r.involved_glyphs)
+            not (self.involved(l) & self.involved(r))
             and not (self.whatuses(l, ff) & self.whatuses(r, ff))
             and self.compatibleRules(l, r)
         )
 
     def compatibleRules(self, l, r):
         from fontFeatures.feaLib.Routine import (
+            _classify,
             arrange_by_type,
             arrange_by_lookup_type,
             arrange_by_flags,
@@ -71,13 +89,104 @@ class MergeNonOverlappingRoutines:
         testRoutine = Routine()
         testRoutine.rules.extend(l.rules)
         testRoutine.rules.extend(r.rules)
-        if arrange_by_type(testRoutine):
+        by_type, by_lookup_type, by_flags = _classify(testRoutine)
+        if arrange_by_type(testRoutine, by_type):
             return False
-        if arrange_by_lookup_type(testRoutine):
+        if arrange_by_lookup_type(testRoutine, by_lookup_type):
             return False
-        if arrange_by_flags(testRoutine):
+        if arrange_by_flags(testRoutine, by_flags):
             return False
         return True
 
 
-optimizations = [MergeNonOverlappingRoutines]
+class MergeSingleSubstChainTargets:
+    level = 2
+
+    def expand(self, ff, glyphclass):
+        glyphs = []
+        for g in glyphclass:
+            if g.startswith("@") and g[1:] in ff.namedClasses:
+                glyphs.extend(ff.namedClasses[g[1:]])
+            else:
+                glyphs.append(g)
+        return glyphs
+
+    def mapping(self, ff, routine):
+        # The input->output mapping of a routine made only of single
+        # substitutions, or None if it does anything else
+        mapping = {}
+        for rule in routine.rules:
+            if not (
+                isinstance(rule, Substitution)
+                and len(rule.input) == 1
+                and len(rule.replacement) == 1
+                and not rule.precontext
+                and not rule.postcontext
+                and not rule.lookups
+                and not rule.reverse
+            ):
+                return None
+            inputs = self.expand(ff, rule.input[0])
+            outputs = self.expand(ff, rule.replacement[0])
+            if len(outputs) == 1:
+                outputs = outputs * len(inputs)
+            elif len(outputs) != len(inputs):
+                return None
+            for l, r in zip(inputs, outputs):
+                # The first substitution of a glyph is the one which applies
+                mapping.setdefault(l, r)
+        return mapping
+
+    def apply(self, ff):
+        logger = logging.getLogger("fontFeatures")
+
+        # Which chains refer to each routine
+        references = {}
+        for chain in ff.allRules(Chaining):
+            for routinelist in chain.lookups:
+                if not routinelist:
+                    continue
+                for routine in routinelist:
+                    references.setdefault(routine, set()).add(chain)
+
+        in_features = set()
+        for routinelist in ff.features.values():
+            in_features.update(routinelist)
+
+        groups = {}
+        for routine in ff.routines:
+            if routine not in references or routine in in_features:
+                continue
+            mapping = self.mapping(ff, routine)
+            if not mapping:
+                continue
+            key = (
+                routine.flags,
+                getattr(routine, "markFilteringSet", None),
+                tuple(tuple(l) for l in routine.languages or ()),
+                frozenset(rule.flags for rule in routine.rules),
+                frozenset(mapping.items()),
+            )
+            groups.setdefault(key, []).append(routine)
+
+        dead = set()
+        for survivor, *duplicates in groups.values():
+            for routine in duplicates:
+                logger.info(
+                    "Merging identical chain targets %s , %s"
+                    % (survivor.name, routine.name)
+                )
+                for chain in references[routine]:
+                    for routinelist in chain.lookups:
+                        if not routinelist:
+                            continue
+                        for ix, r in enumerate(routinelist):
+                            if r is routine:
+                                routinelist[ix] = survivor
+                survivor.usedin |= references[routine]
+                dead.add(routine)
+        if dead:
+            ff.routines = [r for r in ff.routines if r not in dead]
+
+
+optimizations = [MergeSingleSubstChainTargets, MergeNonOverlappingRoutines]
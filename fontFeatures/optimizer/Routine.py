@@ -5,6 +5,14 @@ import logging
 class MoveLongCoverageToClassDefinition:
     level = 1
 
+    # The glyph-list attributes to look at for each type of rule, in the
+    # order they are visited (which decides the order classes are named in).
+    # Other rule types are added as they are seen.
+    fields = {
+        Substitution: ("input", "precontext", "postcontext", "replacement"),
+        Positioning: ("glyphs", "precontext", "postcontext"),
+    }
+
     def gensym(self, ff):
         if not "index" in ff.scratch:
             ff.scratch["index"] = 0
@@ -17,17 +25,27 @@ class MoveLongCoverageToClassDefinition:
                 classname = ff.getNamedClassFor(gc, "class" + self.gensym(ff))
                 i[ix] = ["@" + classname]
 
+    def fields_for(self, klass):
+        # Subclasses of the rule types are rare; look them up the slow way
+        for base in klass.__mro__:
+            if base in self.fields:
+                found = self.fields[base]
+                break
+        else:
+            found = ()
+        self.fields[klass] = found
+        return found
+
     def apply(self, routine, ff):
+        fields = self.fields
         for rule in routine.rules:
-            if isinstance(rule, Substitution):
-                self.replaceLongWithClasses(rule.input, ff)
-                self.replaceLongWithClasses(rule.precontext, ff)
-                self.replaceLongWithClasses(rule.postcontext, ff)
-                self.replaceLongWithClasses(rule.replacement, ff)
-            if isinstance(rule, Positioning):
-                self.replaceLongWithClasses(rule.glyphs, ff)
-                self.replaceLongWithClasses(rule.precontext, ff)
-                self.replaceLongWithClasses(rule.postcontext, ff)
+            klass = type(rule)
+            if klass in fields:
+                names = fields[klass]
+            else:
+                names = self.fields_for(klass)
+            for field in names:
+                self.replaceLongWithClasses(getattr(rule, field), ff)
 
         return []
 
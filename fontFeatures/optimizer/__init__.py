@@ -1,33 +1,81 @@
 from .Routine import optimizations as routine_optimizations
 from .FontFeatures import optimizations as overall_optimizations
 import fontFeatures
+import time
 
 
 class Optimizer:
-    def __init__(self, ff):
+    def __init__(self, ff, collect_stats=False):
         self.ff = ff
+        # When collecting stats, maps each optimization's name to its call
+        # count, time taken and the number of rules before and after it ran
+        self.pass_stats = {} if collect_stats else None
+
+    def _pass_stats(self, optimization, count_rules, *args):
+        if self.pass_stats is None:
+            optimization().apply(*args)
+            return
+        stats = self.pass_stats.setdefault(
+            optimization.__name__,
+            {"calls": 0, "time": 0.0, "rules_before": 0, "rules_after": 0},
+        )
+        stats["calls"] += 1
+        stats["rules_before"] += count_rules()
+        start = time.perf_counter()
+        optimization().apply(*args)
+        stats["time"] += time.perf_counter() - start
+        stats["rules_after"] += count_rules()
+
+    def pass_ranking(self):
+        """Returns the names of the optimizations stats were collected for,
+      ordered by rules removed per second (most effective first)."""
+
+        def effectiveness(name):
+            stats = self.pass_stats[name]
+            removed = stats["rules_before"] - stats["rules_after"]
+            return removed / (stats["time"] or 1e-9)
+
+        return sorted(self.pass_stats, key=effectiveness, reverse=True)
 
     def optimize(self, level=1):
+        # Nothing to do for a font without rules (e.g. unparsed without lookups)
+        if not any(r.rules for r in self.ff.allRoutines()):
+            return
+
+        # Each routine only needs optimizing once, but must be visited in
+        # the same order as before so that generated names stay stable.
+        done = set()
+
+        def optimize_once(r):
+            if r not in done:
+                done.add(r)
+                self.optimize_routine(r, level)
+
         for r in self.ff.routines:
-            self.optimize_routine(r, level)
+            optimize_once(r)
             for k, v in self.ff.features.items():
                 for n in v:
                     if isinstance(n, fontFeatures.Routine):
-                        self.optimize_routine(n, level)
+                        optimize_once(n)
 
         for routinelist in self.ff.features.values():
             for r in routinelist:
-                self.optimize_routine(r, level)
+                optimize_once(r)
                 for k, v in self.ff.features.items():
                     for n in v:
                         if isinstance(n, fontFeatures.Routine):
-                            self.optimize_routine(n, level)
+                            optimize_once(n)
+
+        def count_all_rules():
+            return sum(len(r.rules) for r in self.ff.allRoutines())
 
         for optimization in overall_optimizations:
             if level >= optimization.level:
-                optimization().apply(self.ff)
+                self._pass_stats(optimization, count_all_rules, self.ff)
 
     def optimize_routine(self, r, level):
+        if not r.rules:
+            return
         for optimization in routine_optimizations:
             if level >= optimization.level:
-                optimization().apply(r, self.ff)
+                self._pass_stats(optimization, lambda: len(r.rules), r, self.ff)
@@ -89,13 +89,14 @@ class GPOSUnparser(GTableUnparser):
         for subtable in lookup.SubTable:
             if subtable.Format == 1:
                 spos = fontFeatures.Positioning(
-                    [subtable.Coverage.glyphs],
+                    [self._internGlyphs(subtable.Coverage.glyphs)],
                     [self.makeValueRecord(subtable.Value, subtable.ValueFormat)],
                 )
                 b.addRule(spos)
             else:
                 # Optimize it later
-                for g, v in zip(subtable.Coverage.glyphs, subtable.Value):
+                glyphs = self._internGlyphs(subtable.Coverage.glyphs)
+                for g, v in zip(glyphs, subtable.Value):
                     spos = fontFeatures.Positioning(
                         [[g]], [self.makeValueRecord(v, subtable.ValueFormat)]
                     )
@@ -106,10 +107,12 @@ class GPOSUnparser(GTableUnparser):
         b = fontFeatures.Routine(name=self.getname("PairPositioning" + self.gensym()))
         for subtable in lookup.SubTable:
             if subtable.Format == 1:
-                for g, pair in zip(subtable.Coverage.glyphs, subtable.PairSet):
+                intern = self.internGlyph
+                glyphs = self._internGlyphs(subtable.Coverage.glyphs)
+                for g, pair in zip(glyphs, subtable.PairSet):
                     for vr in pair.PairValueRecord:
                         spos = fontFeatures.Positioning(
-                            [[g], [vr.SecondGlyph]],
+                            [[g], [intern(vr.SecondGlyph)]],
                             [
                                 self.makeValueRecord(vr.Value1, subtable.ValueFormat1),
                                 self.makeValueRecord(vr.Value2, subtable.ValueFormat2),
@@ -144,7 +147,8 @@ class GPOSUnparser(GTableUnparser):
         exits = {}
         for s in lookup.SubTable:
             assert s.Format == 1
-            for glyph, record in zip(s.Coverage.glyphs, s.EntryExitRecord):
+            glyphs = self._internGlyphs(s.Coverage.glyphs)
+            for glyph, record in zip(glyphs, s.EntryExitRecord):
                 if record.EntryAnchor:
                     entries[glyph] = (
                         record.EntryAnchor.XCoordinate,
@@ -183,7 +187,7 @@ class GPOSUnparser(GTableUnparser):
         return b, []
 
     def formatMarkArray(self, markArray, markCoverage, classId):
-        id2Name = markCoverage.glyphs
+        id2Name = self._internGlyphs(markCoverage.glyphs)
         marks = {}
         for i, markRecord in enumerate(markArray.MarkRecord):
             if markRecord.Class == classId:
@@ -195,7 +199,7 @@ class GPOSUnparser(GTableUnparser):
         return marks
 
     def formatMark2Array(self, markArray, markCoverage, anchorClassPrefix):
-        id2Name = markCoverage.glyphs
+        id2Name = self._internGlyphs(markCoverage.glyphs)
         marks = {}
         for i, markRecord in enumerate(markArray.Mark2Record):
             assert len(markRecord.Mark2Anchor) == 1
@@ -206,7 +210,7 @@ class GPOSUnparser(GTableUnparser):
         return marks
 
     def formatBaseArray(self, baseArray, baseCoverage, wantedClassId):
-        id2Name = baseCoverage.glyphs
+        id2Name = self._internGlyphs(baseCoverage.glyphs)
         bases = {}
         for i, baseRecord in enumerate(baseArray.BaseRecord):
             for classId, anchor in enumerate(baseRecord.BaseAnchor):
@@ -302,15 +306,15 @@ class GPOSUnparser(GTableUnparser):
             return
         if hasattr(sub, "BacktrackCoverage"):
             for coverage in reversed(sub.BacktrackCoverage):
-                prefix.append(coverage.glyphs)
+                prefix.append(self._internGlyphs(coverage.glyphs))
         if hasattr(sub, "PosLookupRecord"):
             lookups = self._unparse_lookups(subrule.PosLookupRecord, lookups)
         if hasattr(sub, "InputCoverage"):
             for coverage in sub.InputCoverage:
-                inputs.append(coverage.glyphs)
+                inputs.append(self._internGlyphs(coverage.glyphs))
         if hasattr(sub, "LookAheadCoverage"):
             for i, coverage in enumerate(sub.LookAheadCoverage):
-                suffix.append(coverage.glyphs)
+                suffix.append(self._internGlyphs(coverage.glyphs))
         b.addRule(
             fontFeatures.Positioning(
                 inputs,
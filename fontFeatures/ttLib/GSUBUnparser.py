@@ -81,12 +81,12 @@ class GSUBUnparser(GTableUnparser):
             suffix  = []
             if hasattr(sub, "BacktrackCoverage"):
                 for coverage in reversed(sub.BacktrackCoverage):
-                    prefix.append(coverage.glyphs)
+                    prefix.append(self._internGlyphs(coverage.glyphs))
             if hasattr(sub, "LookAheadCoverage"):
                 for i, coverage in enumerate(sub.LookAheadCoverage):
-                    suffix.append(coverage.glyphs)
-            outputs = [ sub.Substitute ]
-            inputs =  [ sub.Coverage.glyphs ]
+                    suffix.append(self._internGlyphs(coverage.glyphs))
+            outputs = [ self._internGlyphs(sub.Substitute) ]
+            inputs =  [ self._internGlyphs(sub.Coverage.glyphs) ]
             b.addRule(
                 fontFeatures.Substitution(
                     inputs,
@@ -122,7 +122,9 @@ class GSUBUnparser(GTableUnparser):
             for subrulesets, input_ in zip(sub.SubRuleSet, sub.Coverage.glyphs):
                 for subrule in subrulesets.SubRule:
                     lookups = []
-                    allinput = [glyph(x) for x in ([input_] + subrule.Input)]
+                    allinput = [
+                        glyph(x) for x in self._internGlyphs([input_] + subrule.Input)
+                    ]
                     lookups = self._unparse_lookups(subrule.SubstLookupRecord)
                     if len(lookups) <= len(allinput):
                         lookups.extend([None] * (1 + len(allinput) - len(lookups)))
@@ -139,14 +141,14 @@ class GSUBUnparser(GTableUnparser):
             return
         if hasattr(sub, "BacktrackCoverage"):
             for coverage in reversed(sub.BacktrackCoverage):
-                prefix.append(coverage.glyphs)
+                prefix.append(self._internGlyphs(coverage.glyphs))
         assert not hasattr(sub, "SubstLookupRecord")
         if hasattr(sub, "InputCoverage"):
             for coverage in sub.InputCoverage:
-                inputs.append(coverage.glyphs)
+                inputs.append(self._internGlyphs(coverage.glyphs))
         if hasattr(sub, "LookAheadCoverage"):
             for i, coverage in enumerate(sub.LookAheadCoverage):
-                suffix.append(coverage.glyphs)
+                suffix.append(self._internGlyphs(coverage.glyphs))
         b.addRule(
             fontFeatures.Substitution(
                 inputs,
@@ -166,15 +168,15 @@ class GSUBUnparser(GTableUnparser):
             raise ValueError
         if hasattr(sub, "BacktrackCoverage"):
             for coverage in reversed(sub.BacktrackCoverage):
-                prefix.append(coverage.glyphs)
+                prefix.append(self._internGlyphs(coverage.glyphs))
         if hasattr(sub, "SubstLookupRecord"):
             lookups = self._unparse_lookups(sub.SubstLookupRecord)
         if hasattr(sub, "InputCoverage"):
             for coverage in sub.InputCoverage:
-                inputs.append(coverage.glyphs)
+                inputs.append(self._internGlyphs(coverage.glyphs))
         if hasattr(sub, "LookAheadCoverage"):
             for i, coverage in enumerate(sub.LookAheadCoverage):
-                suffix.append(coverage.glyphs)
+                suffix.append(self._internGlyphs(coverage.glyphs))
         if len(lookups) <= len(inputs):
             lookups.extend([None] * (1 + len(inputs) - len(lookups)))
         if len(prefix) > 0 or len(suffix) > 0 or any([x is not None for x in lookups]):
@@ -248,16 +250,17 @@ class GSUBUnparser(GTableUnparser):
         b = fontFeatures.Routine(
             name=self.getname("LigatureSubstitution" + self.gensym())
         )
+        intern = self.internGlyph
         for sub in lookup.SubTable:
             for first, ligatures in sub.ligatures.items():
                 for lig in ligatures:
-                    substarray = [glyph(first)]
+                    substarray = [glyph(intern(first))]
                     for x in lig.Component:
-                        substarray.append(glyph(x))
+                        substarray.append(glyph(intern(x)))
                     b.addRule(
                         fontFeatures.Substitution(
                             substarray,
-                            singleglyph(lig.LigGlyph),
+                            singleglyph(intern(lig.LigGlyph)),
                             address=self.currentLookup,
                             flags=lookup.LookupFlag,
                         )
@@ -268,13 +271,13 @@ class GSUBUnparser(GTableUnparser):
         b = fontFeatures.Routine(
             name=self.getname("MultipleSubstitution" + self.gensym())
         )
-
+        intern = self.internGlyph
         for sub in lookup.SubTable:
             for in_glyph, out_glyphs in sub.mapping.items():
                 b.addRule(
                     fontFeatures.Substitution(
-                        singleglyph(in_glyph),
-                        [glyph(x) for x in out_glyphs],
+                        singleglyph(intern(in_glyph)),
+                        [glyph(intern(x)) for x in out_glyphs],
                         address=self.currentLookup,
                         flags=lookup.LookupFlag,
                     )
@@ -285,12 +288,13 @@ class GSUBUnparser(GTableUnparser):
         b = fontFeatures.Routine(
             name=self.getname("AlternateSubstitution" + self.gensym())
         )
+        intern = self.internGlyph
         for sub in lookup.SubTable:
             for in_glyph, out_glyphs in sub.alternates.items():
                 b.addRule(
                     fontFeatures.Substitution(
-                        singleglyph(in_glyph),
-                        [out_glyphs],
+                        singleglyph(intern(in_glyph)),
+                        [self._internGlyphs(out_glyphs)],
                         address=self.currentLookup,
                         flags=lookup.LookupFlag,
                     )
@@ -301,10 +305,11 @@ class GSUBUnparser(GTableUnparser):
         b = fontFeatures.Routine(
             name=self.getname("SingleSubstitution" + self.gensym())
         )
+        intern = self.internGlyph
         for sub in lookup.SubTable:
             if len(sub.mapping) > 5:
-                k = list(sub.mapping.keys())
-                v = list(sub.mapping.values())
+                k = self._internGlyphs(sub.mapping.keys())
+                v = self._internGlyphs(sub.mapping.values())
                 b.addRule(
                     fontFeatures.Substitution(
                         [k], [v], address=self.currentLookup, flags=lookup.LookupFlag
@@ -314,8 +319,8 @@ class GSUBUnparser(GTableUnparser):
                 for k, v in sub.mapping.items():
                     b.addRule(
                         fontFeatures.Substitution(
-                            [[k]],
-                            [[v]],
+                            [[intern(k)]],
+                            [[intern(v)]],
                             address=self.currentLookup,
                             flags=lookup.LookupFlag,
                         )
@@ -2,13 +2,20 @@ from collections import OrderedDict
 from fontTools.misc.xmlWriter import XMLWriter
 import fontFeatures
 from io import BytesIO
+import sys
 
 
 class GTableUnparser:
-    def __init__(self, table, ff, languageSystems, font=None, config={}):
+    def __init__(
+        self, table, ff, languageSystems, font=None, config={}, glyphset=None
+    ):
         self.table = table.table
         self.font = font
         self.fontFeatures = ff
+        if ff is not None:
+            self.internGlyph = ff.internGlyph
+        else:
+            self.internGlyph = sys.intern
         self.lookupNames = []
         self.config = config
         self.index = 0
@@ -16,6 +23,11 @@ class GTableUnparser:
         self.sharedClasses = {}
         self.languageSystems = languageSystems
         self.sharedLookups = OrderedDict()
+        # unparse() builds the font's glyph set once and shares it between
+        # the GSUB and GPOS unparsers; otherwise it is built on first use
+        self._glyphset = None
+        if glyphset is not None:
+            self._glyphset = (font, glyphset)
 
     def _unparse_lookups(self, slr, in_lookups=None):
         lookups = []
@@ -32,16 +44,32 @@ class GTableUnparser:
             lookups[sl.SequenceIndex].append(self.lookups[sl.LookupListIndex]["lookup"])
         return lookups
 
+    def _internGlyphs(self, glyphs):
+        if self.fontFeatures is None:
+            return list(map(sys.intern, glyphs))
+        # Nearly every name has been seen before, so try the table directly
+        # rather than making a method call per glyph
+        get = self.fontFeatures._glyph_intern.get
+        intern = self.internGlyph
+        return [get(g) or intern(g) for g in glyphs]
+
     def _invertClassDef(self, a, font):
+        intern = self.internGlyph
         classes = {}
         for glyph, klass in a.items():
             if klass not in classes:
                 classes[klass] = []
-            classes[klass].append(glyph)
-        glyphset = set(font.getGlyphOrder())
-        classes[0] = glyphset - set(a.keys())
+            classes[klass].append(intern(glyph))
+        classes[0] = self._glyphSet(font).difference(a)
         return classes
 
+    def _glyphSet(self, font):
+        # Every class definition needs the full glyph set to work out class
+        # 0, so build it once per font rather than once per class definition
+        if self._glyphset is None or self._glyphset[0] is not font:
+            self._glyphset = (font, set(self._internGlyphs(font.getGlyphOrder())))
+        return self._glyphset[1]
+
     def getname(self, n):
         if n in self.config:
             return self.config[n]
@@ -184,7 +212,9 @@ class GTableUnparser:
 
     def unparseLookups(self):
         lookupOrder = range(0, len(self.table.LookupList.Lookup))
-        # Reorder to check for dependencies
+        # Reorder to check for dependencies. A lookup's dependencies don't
+        # change from one pass to the next, so only walk its subtables once
+        chainDeps = {}
         newOrder = []
         while True:
             changed = False
@@ -192,8 +222,9 @@ class GTableUnparser:
             for lookupIdx in lookupOrder:
                 lookup = self.table.LookupList.Lookup[lookupIdx]
                 if self.isChaining(lookup.LookupType):
-                    dependencies = self.getDependencies(lookup)
-                    for l in dependencies:
+                    if lookupIdx not in chainDeps:
+                        chainDeps[lookupIdx] = self.getDependencies(lookup)
+                    for l in chainDeps[lookupIdx]:
                         if l not in newOrder:
                             newOrder.append(l)
                             changed = True
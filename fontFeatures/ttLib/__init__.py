@@ -2,11 +2,14 @@ from fontTools.misc.py23 import *
 import fontTools
 from fontTools.feaLib.ast import *
 from collections import OrderedDict
+import multiprocessing
+import os
 
 from .GDEFUnparser import GDEFUnparser
 from .GSUBUnparser import GSUBUnparser
 from .GPOSUnparser import GPOSUnparser
 from fontFeatures import FontFeatures
+import fontFeatures
 
 
 def unparseLanguageSystems(tables):
@@ -14,21 +17,93 @@ def unparseLanguageSystems(tables):
     for table in tables:
         for scriptRecord in table.table.ScriptList.ScriptRecord:
             scriptTag = scriptRecord.ScriptTag
-            languages = scripts.get(scriptTag, [])
+            if scriptTag in scripts:
+                continue
             script = scriptRecord.Script
-            items = []
+            languages = {l.LangSysTag for l in script.LangSysRecord}
             if script.DefaultLangSys is not None:
-                items.append(("dflt", script.DefaultLangSys))
-            items += [(l.LangSysTag, l.LangSys) for l in script.LangSysRecord]
-            languages = set([i[0] for i in items])
-
-            if languages and not scriptTag in scripts:
+                languages.add("dflt")
+            if languages:
                 scripts[scriptTag] = languages
 
     return scripts
 
 
-def unparse(font, do_gdef=False, doLookups=True, config={}):
+# Set in the forked worker process by _init_worker
+_worker_state = None
+
+
+def _init_worker(*state):
+    global _worker_state
+    _worker_state = state
+
+
+def _unparse_gpos_in_worker():
+    font, languageSystems, config, doLookups, glyphset = _worker_state
+    ff = FontFeatures()
+    GPOSUnparser(
+        font["GPOS"],
+        ff,
+        languageSystems,
+        font=font,
+        config=config,
+        glyphset=glyphset,
+    ).unparse(doLookups=doLookups)
+    # The font stays behind; the parent process puts it back
+    for rule in ff.allRules(fontFeatures.Attachment):
+        rule.font = None
+    return ff.routines, list(ff.features.items())
+
+
+def _usable_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _reintern(ff, routines):
+    # Names come back from the worker as copies; swap them for the parent's
+    # interned strings so GPOS rules share them with GSUB ones
+    intern = ff.internGlyph
+
+    def glyphlists(lists):
+        for ix, glyphs in enumerate(lists):
+            lists[ix] = [intern(g) for g in glyphs]
+
+    for routine in routines:
+        for rule in routine.rules:
+            if isinstance(rule, fontFeatures.Attachment):
+                rule.bases = {intern(g): v for g, v in rule.bases.items()}
+                rule.marks = {intern(g): v for g, v in rule.marks.items()}
+                continue
+            for attr in ("glyphs", "input", "precontext", "postcontext"):
+                if hasattr(rule, attr):
+                    glyphlists(getattr(rule, attr))
+
+
+def _gpos_future(font, languageSystems, config, doLookups, glyphset):
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        return None, None
+    # Anything the worker needs from the font file (such as the glyph order
+    # behind glyphset) must be read before the fork, as both processes would
+    # otherwise share one file offset. The worker inherits initargs through
+    # the fork rather than having them pickled.
+    pool = context.Pool(
+        1,
+        initializer=_init_worker,
+        initargs=(font, languageSystems, config, doLookups, glyphset),
+    )
+    return pool, pool.apply_async(_unparse_gpos_in_worker)
+
+
+def unparse(font, do_gdef=False, doLookups=True, config={}, parallel=False):
+    """Unparses the GSUB and GPOS tables of a TTFont into a FontFeatures
+  object. If ``parallel`` is true, the GPOS table is unparsed in a forked
+  worker process at the same time as the GSUB table is unparsed in this one.
+  This falls back to doing both here on platforms which cannot fork, or when
+  only one CPU is available and a worker could only slow things down."""
     gsub_gpos = [font[tableTag] for tableTag in ("GSUB", "GPOS") if tableTag in font]
     ff = FontFeatures()
 
@@ -39,13 +114,60 @@ def unparse(font, do_gdef=False, doLookups=True, config={}):
     #     if table:
     #         ff.statements.append(table)
 
-    if "GSUB" in font:
-        GSUBUnparser(
-            font["GSUB"], ff, languageSystems, font=font, config=config
-        ).unparse(doLookups=doLookups)
+    # Shared by both unparsers when inverting class definitions
+    glyphset = None
+    if gsub_gpos:
+        glyphset = set(map(ff.internGlyph, font.getGlyphOrder()))
+
+    pool, gpos = None, None
+    try:
+        if (
+            parallel
+            and "GSUB" in font
+            and "GPOS" in font
+            and _usable_cpus() > 1
+        ):
+            pool, gpos = _gpos_future(
+                font, languageSystems, config, doLookups, glyphset
+            )
+
+        if "GSUB" in font:
+            GSUBUnparser(
+                font["GSUB"],
+                ff,
+                languageSystems,
+                font=font,
+                config=config,
+                glyphset=glyphset,
+            ).unparse(doLookups=doLookups)
 
-    if "GPOS" in font:
-        GPOSUnparser(
-            font["GPOS"], ff, languageSystems, font=font, config=config
-        ).unparse(doLookups=doLookups)
+        if gpos:
+            routines, features = gpos.get()
+            for r in routines:
+                ff.addRoutine(r)
+            for name, rs in features:
+                ff.addFeature(name, rs)
+            worker_routines = set(routines)
+            for _, rs in features:
+                worker_routines.update(
+                    r for r in rs if isinstance(r, fontFeatures.Routine)
+                )
+            _reintern(ff, worker_routines)
+            for rule in ff.allRules(fontFeatures.Attachment):
+                rule.font = font
+        elif "GPOS" in font:
+            GPOSUnparser(
+                font["GPOS"],
+                ff,
+                languageSystems,
+                font=font,
+                config=config,
+                glyphset=glyphset,
+            ).unparse(doLookups=doLookups)
+    finally:
+        # Also reached if GSUB unparsing or the worker failed, so the worker
+        # process is never left behind
+        if pool is not None:
+            pool.terminate()
+            pool.join()
     return ff
@@ -1,15 +1,11 @@
 #!env python
 import sys
-from fontTools.ttLib import TTFont
-from fontFeatures.ttLib import unparse
-from fontFeatures.optimizer import Optimizer
 from argparse import ArgumentParser
 
 import logging
+import mmap
 import os
-
-LOGLEVEL = os.environ.get("LOGLEVEL", "WARNING").upper()
-logging.basicConfig(level=LOGLEVEL)
+import tempfile
 
 import warnings
 
@@ -18,40 +14,180 @@ def warning_on_one_line(message, category, filename, lineno, file=None, line=Non
     return "# [warning] %s\n" % (message)
 
 
-warnings.formatwarning = warning_on_one_line
-
-parser = ArgumentParser()
-parser.add_argument("input", help="font file to process", metavar="FILE")
-parser.add_argument(
-    "--gdef",
-    dest="gdef",
-    action="store_true",
-    help="Also output GDEF table information",
-)
-parser.add_argument(
-    "--no-lookups",
-    dest="nolookups",
-    action="store_true",
-    help="Just list languages and features, don't unparse lookups",
-)
-parser.add_argument(
-    "--config", default=None, help="config file to process", metavar="CONFIG"
-)
-parser.add_argument(
-    "-O", "--optimize", dest="optimize", type=int, default=1, help="Run optimizer"
-)
-
-args = parser.parse_args()
-
-config = {}
-if args.config:
+def load_config(path):
+    # The parsed config is cached in marshal format, which is much quicker to
+    # load than JSON when otf2fea is run over many fonts. The cache is keyed
+    # on a hash of the config's contents rather than its mtime, so a config
+    # replaced by an older copy is never mistaken for the cached one.
+    import hashlib
+    import marshal
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha1(data).digest()
+
+    cachedir = os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+        "fontFeatures",
+    )
+    cache = os.path.join(
+        cachedir,
+        hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest() + ".mcache",
+    )
+    try:
+        with open(cache, "rb") as f:
+            cached = marshal.load(f)
+        if isinstance(cached, tuple) and len(cached) == 2 and cached[0] == digest:
+            return cached[1]
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
     import json
 
-    with open(args.config) as f:
-        config = json.load(f)
+    config = json.loads(data.decode("utf-8"))
+    try:
+        os.makedirs(cachedir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cachedir, suffix=".mcache")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump((digest, config), f)
+            os.replace(tmp, cache)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass  # e.g. no writable cache directory; just parse it again next time
+    return config
+
+
+def write_features(font, args, config, out):
+    # These pull in all of fontTools, so are only imported once there is a
+    # font to process
+    from fontFeatures.ttLib import unparse
+    from fontFeatures.optimizer import Optimizer
+
+    ff = unparse(
+        font,
+        do_gdef=args.gdef,
+        doLookups=(not args.nolookups),
+        config=config,
+        parallel=args.parallel,
+    )
+    if args.optimize and not args.nolookups:
+        Optimizer(ff).optimize(level=args.optimize)
+    ff.writeFea(out)
+    out.write("\n")
+
+
+def process(path, args, config, out):
+    from fontTools.ttLib import TTFont
+
+    with open(path, "rb") as fd:
+        try:
+            mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mm = None
+    if mm is None:
+        # Empty files, pipes and some network filesystems can't be mapped;
+        # leave reading those to fontTools
+        write_features(TTFont(path, lazy=True), args, config, out)
+        return
+    # The mapped file backs the lazily-loaded tables, so keep it open until
+    # the feature code has been produced
+    with mm:
+        write_features(TTFont(mm, lazy=True), args, config, out)
+
+
+def process_to_file(path, args, config):
+    # Written to a temporary file which only replaces the .fea once the font
+    # has been fully processed, so a bad font never leaves a truncated one
+    target = os.path.splitext(path)[0] + ".fea"
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(target) or ".", prefix=".otf2fea-", suffix=".fea"
+    )
+    try:
+        with os.fdopen(fd, "w") as out:
+            process(path, args, config, out)
+        # mkstemp makes the file private; give it the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def main():
+    LOGLEVEL = os.environ.get("LOGLEVEL", "WARNING").upper()
+    # Rather than installing a handler up front, let logging's last-resort
+    # handler write any records to stderr
+    logging.getLogger().setLevel(LOGLEVEL)
+    logging.lastResort.setLevel(LOGLEVEL)
+
+    warnings.formatwarning = warning_on_one_line
+
+    parser = ArgumentParser()
+    parser.add_argument(
+        "input", nargs="?", help="font file to process", metavar="FILE"
+    )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        action="store_true",
+        help="Read font files to process from standard input, one per line, "
+        "writing each one's feature code alongside it with a .fea extension",
+    )
+    parser.add_argument(
+        "--gdef",
+        dest="gdef",
+        action="store_true",
+        help="Also output GDEF table information",
+    )
+    parser.add_argument(
+        "--no-lookups",
+        dest="nolookups",
+        action="store_true",
+        help="Just list languages and features, don't unparse lookups",
+    )
+    parser.add_argument(
+        "--config", default=None, help="config file to process", metavar="CONFIG"
+    )
+    parser.add_argument(
+        "--parallel",
+        dest="parallel",
+        action="store_true",
+        help="Unparse GSUB and GPOS in separate processes",
+    )
+    parser.add_argument(
+        "-O", "--optimize", dest="optimize", type=int, default=1, help="Run optimizer"
+    )
+    args = parser.parse_args()
+    if not args.batch and not args.input:
+        parser.error("a font file is required unless --batch is given")
+    if args.batch and args.input:
+        parser.error("--batch reads font files from standard input, not FILE")
+
+    config = {}
+    if args.config:
+        config = load_config(args.config)
+
+    if args.batch:
+        failed = 0
+        for line in sys.stdin:
+            path = line.strip()
+            if not path:
+                continue
+            try:
+                process_to_file(path, args, config)
+            except Exception as e:
+                logging.getLogger("fontFeatures").error("%s: %s", path, e)
+                failed += 1
+        if failed:
+            sys.exit(1)
+    else:
+        process(args.input, args, config, sys.stdout)
+
 
-font = TTFont(args.input)
-ff = unparse(font, do_gdef=args.gdef, doLookups=(not args.nolookups), config=config)
-if args.optimize:
-    Optimizer(ff).optimize(level=args.optimize)
-print(ff.asFea())
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,8 @@ config = {
     'license': 'MIT',
     'version': '0.0.1',
     'install_requires': install_requires,
+    # numba is optional: jankyPOS uses it to compile its attachment loops
+    'extras_require': {'numba': ['numba']},
     'classifiers': [
         "Programming Language :: Python",
         "Programming Language :: Python :: 2",
@@ -1,4 +1,13 @@
-from fontFeatures import Chaining, Positioning, ValueRecord, Routine, Substitution
+from fontFeatures import (
+    Chaining,
+    Positioning,
+    ValueRecord,
+    Routine,
+    Substitution,
+    FontFeatures,
+)
+import fontFeatures.feaLib.Chaining
+from unittest import mock
 
 
 import unittest
@@ -32,3 +41,32 @@ class TestChaining(unittest.TestCase):
 
         c = Chaining([["a"], ["b"]], lookups=[[r1, r2], None])
         self.assertEqual(c.asFea(), "sub a' lookup dummy1 lookup dummy2 b';")
+
+    @mock.patch.object(fontFeatures.feaLib.Chaining, "EXPERIMENTAL_FONTTOOLS", False)
+    def test_synthesised_lookups(self):
+        ff = FontFeatures()
+        r1 = Routine(rules=[Substitution([["a"]], [["b"]])], name="dummy1")
+        r2 = Routine(rules=[Substitution([["c"]], [["d"]])], name="dummy2")
+        ff.addRoutine(r1)
+        ff.addRoutine(r2)
+        c1 = Chaining([["a"], ["c"]], lookups=[[r1, r2], None])
+        c2 = Chaining([["c"]], lookups=[[r2, r1]])
+        self.assertEqual(len(c1.feaPreamble(ff)), 1)
+        self.assertEqual(len(c2.feaPreamble(ff)), 0)
+        self.assertIs(c1.lookups[0][0], c2.lookups[0][0])
+        self.assertEqual(c1.lookups[0][0].name, "dummy1_dummy2")
+
+    @mock.patch.object(fontFeatures.feaLib.Chaining, "EXPERIMENTAL_FONTTOOLS", False)
+    def test_synthesised_unnamed_lookups(self):
+        ff = FontFeatures()
+        sub1 = Routine(rules=[Substitution([["a"]], [["b"]])])
+        sub2 = Routine(rules=[Substitution([["c"]], [["d"]])])
+        pos = Routine(rules=[Positioning([["a"]], [ValueRecord(xAdvance=120)])])
+        # An incompatible pair of unnamed routines does not decide the fate
+        # of a later, compatible one
+        c1 = Chaining([["a"]], lookups=[[sub1, pos]])
+        c2 = Chaining([["a"]], lookups=[[sub1, sub2]])
+        self.assertEqual(len(c1.feaPreamble(ff)), 0)
+        self.assertEqual(len(c2.feaPreamble(ff)), 1)
+        self.assertIn("sub [a c] by [b d];", c2.lookups[0][0].asFea())
+        self.assertTrue(c2.lookups[0][0].name)
@@ -3,6 +3,7 @@ from fontFeatures.feaLib import FeaUnparser
 
 import unittest
 import pytest
+import io
 
 import re
 
@@ -25,6 +26,15 @@ class TestFeaUnparser(unittest.TestCase):
         for s in tests:
             self.assertSufficientlyEqual(FeaUnparser(s).ff.asFea(), s)
 
+    def test_write_fea(self):
+        s = "lookup dummy { sub a by b; } dummy; feature liga { lookup dummy; } liga;"
+        out = io.StringIO()
+        FeaUnparser(s).ff.writeFea(out)
+        self.assertEqual(out.getvalue(), FeaUnparser(s).ff.asFea())
+        buf = []
+        FeaUnparser(s).ff.asFea(buf)
+        self.assertEqual("".join(buf), out.getvalue())
+
     def test_single_subst(self):
         tests = [
             "lookup dummy { sub a by b; } dummy;",
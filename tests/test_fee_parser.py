@@ -103,3 +103,13 @@ def test_substitute2(parser):
     assert alltrim(parser.fontfeatures.asFea()) == alltrim(
         "feature rlig { sub [a b] by [c d]; } rlig;"
     )
+
+
+def test_classdefinition_with_bracketed_predicate(parser):
+    s = "DefineClass @foo = /\\.sc$/ and (width > width(a.sc));"
+    parser.parser(s).statement()
+    assert len(parser.fontfeatures.namedClasses["foo"]) == 39
+
+    s = "DefineClass @bar = /^a.*\\.sc$/ and (width = width(a.sc));"
+    parser.parser(s).statement()
+    assert "aacute.sc" in parser.fontfeatures.namedClasses["bar"]
@@ -3,6 +3,8 @@ from fontFeatures.jankyPOS import JankyPos
 from fontFeatures.ttLib import unparse
 from fontTools.ttLib import TTFont
 import unittest
+import pytest
+import fontFeatures.jankyPOS as jankyPOS
 
 
 class TestPositioning(unittest.TestCase):
@@ -15,6 +17,13 @@ class TestPositioning(unittest.TestCase):
             "H+708@<0,0>|A+612@<0,0>|Z+618@<0,0>"
         )
 
+    def test_buffer_to_dicts(self):
+        buf = self.janky.positioning_buffer(["H", "A"])
+        infos = buf.to_dicts()
+        self.assertEqual(infos[1]["glyph"], "A")
+        self.assertEqual(infos[1]["position"].xAdvance, 612)
+        self.assertEqual(infos[1]["category"], buf.categories[1])
+
     # def test_buffer_rtl(self):
     #   buf = self.janky.positioning_buffer(["uni0633.init","uni0646.fina"], direction="RTL")
     #   self.assertEqual(buf[0]["glyph"], "uni0646.fina")
@@ -22,6 +31,17 @@ class TestPositioning(unittest.TestCase):
     #   self.assertEqual(buf[1]["glyph"], "uni0633.init")
     #   self.assertEqual(buf[1]["position"], ValueRecord(xAdvance=568))
 
+    def test_rule_subclass(self):
+        class MyPositioning(Positioning):
+            pass
+
+        buf = self.janky.positioning_buffer(["H", "A", "Z"])
+        s = MyPositioning([["A"]], [ValueRecord(xAdvance=120)])
+        buf = self.janky.process_rules(buf, [s])
+        self.assertEqual(self.janky.serialize_buffer(buf),
+            "H+708@<0,0>|A+732@<0,0>|Z+618@<0,0>"
+        )
+
     def test_single(self):
         buf = self.janky.positioning_buffer(["H", "A", "Z"])
         v = ValueRecord(xAdvance=120)
@@ -31,25 +51,44 @@ class TestPositioning(unittest.TestCase):
             "H+708@<0,0>|A+732@<0,0>|Z+618@<0,0>"
         )
 
-    def test_anchor(self):
-        self.font = TTFont("fonts/Roboto-Regular.ttf")
-        self.janky = JankyPos(self.font)
 
-        buf = self.janky.positioning_buffer(["F", "acutecomb", "B"])
-        s = Attachment("top", "top_", {"F": (619, 1612)}, {"acutecomb": (-570, 1290)})
-        buf = self.janky.process_rules(buf, [s])
-        # Harfbuzz has 52 here, not 57, but I am not sure why
-        self.assertEqual(self.janky.serialize_buffer(buf),
-            "F+1132@<0,0>|acutecomb+0@<57,322>|B+1275@<0,0>"
-        )
+# The attachment code has numba kernels and pure Python fallbacks; run the
+# attachment tests against both so that they are kept in agreement
+@pytest.fixture(params=["python", "numba"])
+def attach_backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(jankyPOS, "_attach_kernel", None)
+        monkeypatch.setattr(jankyPOS, "_attach_cursive_kernel", None)
+    else:
+        pytest.importorskip("numba")
+        assert jankyPOS._attach_kernel is not None
+        assert jankyPOS._attach_cursive_kernel is not None
+    return request.param
+
+
+def test_anchor(attach_backend):
+    font = TTFont("fonts/Roboto-Regular.ttf")
+    janky = JankyPos(font)
+
+    buf = janky.positioning_buffer(["F", "acutecomb", "B"])
+    s = Attachment("top", "top_", {"F": (619, 1612)}, {"acutecomb": (-570, 1290)})
+    buf = janky.process_rules(buf, [s])
+    # Harfbuzz has 52 here, not 57, but I am not sure why
+    assert (
+        janky.serialize_buffer(buf)
+        == "F+1132@<0,0>|acutecomb+0@<57,322>|B+1275@<0,0>"
+    )
+
 
-    def test_urdu(self):
-        font = TTFont("fonts/NotoNastaliqUrdu-Dummy.ttf")
-        janky = JankyPos(font, direction="RTL")
-        ff = unparse(font)
-        buf = janky.positioning_buffer(["SeenIni", "SeenMed", "NoonxFin"])
-        buf = janky.process_fontfeatures(buf, ff)
-        # Note that this is technically incorrect, because we do not
-        # currently support the RightToLeft flag of cursive attachments.
-        self.assertEqual(janky.serialize_buffer(buf),
-            "NoonxFin+749@<0,-558>|SeenMed+538@<0,-223>|SeenIni+607@<0,0>")
+def test_urdu(attach_backend):
+    font = TTFont("fonts/NotoNastaliqUrdu-Dummy.ttf")
+    janky = JankyPos(font, direction="RTL")
+    ff = unparse(font)
+    buf = janky.positioning_buffer(["SeenIni", "SeenMed", "NoonxFin"])
+    buf = janky.process_fontfeatures(buf, ff)
+    # Note that this is technically incorrect, because we do not
+    # currently support the RightToLeft flag of cursive attachments.
+    assert (
+        janky.serialize_buffer(buf)
+        == "NoonxFin+749@<0,-558>|SeenMed+538@<0,-223>|SeenIni+607@<0,0>"
+    )
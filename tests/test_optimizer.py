@@ -1,4 +1,4 @@
-from fontFeatures import Substitution, Routine, FontFeatures
+from fontFeatures import Substitution, Chaining, Routine, FontFeatures
 from fontFeatures.optimizer import Optimizer
 
 import unittest
@@ -27,6 +27,22 @@ class TestSubstitution(unittest.TestCase):
         Optimizer(FontFeatures()).optimize_routine(r1, level=1)
         self.assertEqual(r1.asFea(), "    sub [a b d y] by [c c e z];\n")
 
+    def test_rule_subclass(self):
+        class MySubstitution(Substitution):
+            pass
+
+        r1 = Routine(
+            rules=[MySubstitution([["a"]], [["b"]]), MySubstitution([["c"]], [["d"]])]
+        )
+        Optimizer(FontFeatures()).optimize_routine(r1, level=1)
+        self.assertEqual(r1.asFea(), "    sub [a c] by [b d];\n")
+
+        r2 = Routine(
+            rules=[MySubstitution([["a", "b", "c", "d", "e", "f", "g", "h"]], [["z"]])]
+        )
+        Optimizer(FontFeatures()).optimize_routine(r2, level=1)
+        self.assertEqual(r2.asFea(), "    sub @class1 by z;\n")
+
     def test_GlyphClasses(self):
         r1 = Routine(
             rules=[Substitution([["a", "b", "c", "d", "e", "f", "g", "h"]], [["z"]]),]
@@ -37,3 +53,54 @@ class TestSubstitution(unittest.TestCase):
         self.assertEqual(
             ff.namedClasses["class1"], ("a", "b", "c", "d", "e", "f", "g", "h")
         )
+
+    def test_MergeSingleSubstChainTargets(self):
+        ff = FontFeatures()
+        r1 = Routine(name="one", rules=[Substitution([["a", "b"]], [["c", "d"]])])
+        r2 = Routine(
+            name="two",
+            rules=[Substitution([["a"]], [["c"]]), Substitution([["b"]], [["d"]])],
+        )
+        c1 = Chaining([["a"]], precontext=[["x"]], lookups=[[r1]])
+        c2 = Chaining([["b"]], precontext=[["y"]], lookups=[[r2]])
+        ff.addRoutine(r1)
+        ff.addRoutine(r2)
+        ff.addFeature("calt", [Routine(rules=[c1, c2])])
+        Optimizer(ff).optimize(level=2)
+        self.assertEqual(ff.routines, [r1])
+        self.assertIs(c1.lookups[0][0], r1)
+        self.assertIs(c2.lookups[0][0], r1)
+
+    def test_MergeSingleSubstChainTargets_languages(self):
+        ff = FontFeatures()
+        r1 = Routine(
+            name="one",
+            rules=[Substitution([["a"]], [["c"]])],
+            languages=[("arab", "URD ")],
+        )
+        r2 = Routine(
+            name="two",
+            rules=[Substitution([["a"]], [["c"]])],
+            languages=[("arab", "FAR ")],
+        )
+        c1 = Chaining([["a"]], precontext=[["x"]], lookups=[[r1]])
+        c2 = Chaining([["a"]], precontext=[["y"]], lookups=[[r2]])
+        ff.addRoutine(r1)
+        ff.addRoutine(r2)
+        ff.addFeature("calt", [Routine(rules=[c1, c2])])
+        Optimizer(ff).optimize(level=2)
+        self.assertEqual(ff.routines, [r1, r2])
+        self.assertIs(c2.lookups[0][0], r2)
+
+    def test_pass_stats(self):
+        r1 = Routine(
+            rules=[Substitution([["a"]], [["b"]]), Substitution([["c"]], [["d"]])]
+        )
+        optimizer = Optimizer(FontFeatures(), collect_stats=True)
+        optimizer.optimize_routine(r1, level=1)
+        stats = optimizer.pass_stats["MergeMultipleSingleSubstitutions"]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual((stats["rules_before"], stats["rules_after"]), (2, 1))
+        self.assertEqual(
+            optimizer.pass_ranking()[0], "MergeMultipleSingleSubstitutions"
+        )
@@ -0,0 +1,79 @@
+import os
+import shutil
+import subprocess
+import sys
+
+OTF2FEA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "otf2fea.py")
+
+
+def otf2fea(*args, **kwargs):
+    return subprocess.run(
+        [sys.executable, OTF2FEA, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        **kwargs
+    )
+
+
+def test_batch_carries_on_past_bad_fonts(tmp_path):
+    good = tmp_path / "good.otf"
+    shutil.copy("tests/data/LibertinusSans-Regular.otf", str(good))
+    missing = tmp_path / "missing.otf"
+    missing2 = tmp_path / "missing2.otf"
+    result = otf2fea(
+        "--batch",
+        "--no-lookups",
+        input="%s\n%s\n%s\n" % (missing, good, missing2),
+    )
+    assert result.returncode == 1
+    # Every failure is reported in the same bare format
+    errors = result.stderr.splitlines()
+    assert len(errors) == 2
+    assert errors[0].startswith(str(missing) + ": ")
+    assert errors[1].startswith(str(missing2) + ": ")
+    assert "feature kern" in (tmp_path / "good.fea").read_text()
+    assert not (tmp_path / "missing.fea").exists()
+    assert sorted(os.listdir(str(tmp_path))) == ["good.fea", "good.otf"]
+
+
+def test_batch_rejects_file(tmp_path):
+    result = otf2fea("--batch", "tests/data/LibertinusSans-Regular.otf", input="")
+    assert result.returncode == 2
+    assert "--batch" in result.stderr
+
+
+def test_config_cache(tmp_path, monkeypatch):
+    import json
+    import otf2fea
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    parses = []
+    loads = json.loads
+    monkeypatch.setattr(json, "loads", lambda s: parses.append(s) or loads(s))
+
+    config = tmp_path / "config.json"
+    config.write_text('{"GSUB": {"1": "first"}}')
+    assert otf2fea.load_config(str(config)) == {"GSUB": {"1": "first"}}
+    assert len(parses) == 1
+    # The cache lives in the user's cache directory, not beside the config
+    assert sorted(os.listdir(str(tmp_path))) == ["cache", "config.json"]
+
+    # A fresh cache is used without parsing the JSON again
+    assert otf2fea.load_config(str(config)) == {"GSUB": {"1": "first"}}
+    assert len(parses) == 1
+
+    config.write_text('{"GSUB": {"1": "second"}}')
+    assert otf2fea.load_config(str(config)) == {"GSUB": {"1": "second"}}
+    assert len(parses) == 2
+
+    # Replacing the config with a copy carrying an older mtime, as cp -p or
+    # rsync -a would, must not bring back the cached version
+    replacement = tmp_path / "replacement.json"
+    replacement.write_text('{"GSUB": {"1": "third"}}')
+    stat = config.stat()
+    os.utime(str(replacement), ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+    os.replace(str(replacement), str(config))
+    assert otf2fea.load_config(str(config)) == {"GSUB": {"1": "third"}}
+    assert len(parses) == 3
+    assert len(os.listdir(str(tmp_path / "cache" / "fontFeatures"))) == 1
@@ -51,3 +51,29 @@ class TestUnparse(unittest.TestCase):
     # def test_pair(self):
     #   g,_ = self.unparser.unparseLookup(self.lookups[56])
     #   self.assertEqual(g.rules[0].asFea(),"pos uni0621.float <-146 0 0 0>;")
+
+
+def test_parallel_unparse(monkeypatch):
+    import fontFeatures
+    import fontFeatures.ttLib as ttLib
+
+    # Force the forked worker even on a single-CPU machine
+    monkeypatch.setattr(ttLib, "_usable_cpus", lambda: 2)
+    calls = []
+    gpos_future = ttLib._gpos_future
+    monkeypatch.setattr(
+        ttLib, "_gpos_future", lambda *a: calls.append(a) or gpos_future(*a)
+    )
+    font = TTFont("fonts/Amiri-Regular.ttf")
+    ff = ttLib.unparse(font, parallel=True)
+    assert calls
+    assert ff.asFea() == ttLib.unparse(TTFont("fonts/Amiri-Regular.ttf")).asFea()
+
+    # Glyph names from the worker share the parent's interned strings
+    rule = next(iter(ff.allRules(fontFeatures.Attachment)))
+    glyph = next(iter(rule.bases))
+    assert ff.internGlyph(glyph) is glyph
+
+    positioning = next(iter(ff.allRules(fontFeatures.Positioning)))
+    glyph = positioning.glyphs[0][0]
+    assert ff.internGlyph(glyph) is glyph
@@ -40,3 +40,13 @@ class TestUnparse(unittest.TestCase):
             g.rules[0].asFea(),
             "sub uni0644' lookup SingleSubstitution32 uni0621' lookup SingleSubstitution31 uni0627' lookup SingleSubstitution32;",
         )
+
+    def test_interned_glyphs(self):
+        ff = FontFeatures()
+        unparser = GSUBUnparser(self.font["GSUB"], ff, [])
+        g, _ = unparser.unparseLookup(self.lookups[0], 0)
+        h, _ = unparser.unparseLookup(self.lookups[0], 0)
+        self.assertIs(g.rules[0].input[0][0], h.rules[0].input[0][0])
+        self.assertIs(
+            g.rules[0].input[0][0], ff.internGlyph(g.rules[0].input[0][0])
+        )
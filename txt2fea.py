@@ -27,7 +27,7 @@ if args.classfile:
   classes = parser.glyphclasses_.scopes_[0]
   parsed.scratch["glyphclasses"] = {}
   for k,v in classes.items():
-  	parsed.scratch["glyphclasses"][tuple(sorted(v.glyphs.glyphs))] = k
+  	parsed.scratch["glyphclasses"][frozenset(v.glyphs.glyphs)] = k
   parsed.scratch["index"] = 999
 
 if args.optimize: